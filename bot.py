@@ -45,6 +45,95 @@ application = Application.builder().token(TELEGRAM_TOKEN).build()
 # Контекст диалогов
 dialog_context = {}
 
+# === Индикатор действий в чате ===
+CHAT_ACTION_INTERVAL = 4  # Telegram показывает действие ~5 секунд, обновляем чуть раньше
+
+class ChatActionManager:
+    """Общий индикатор действий: не больше одного send_chat_action на чат за интервал"""
+
+    def __init__(self, interval=CHAT_ACTION_INTERVAL):
+        self.interval = interval
+        self._actions = {}  # chat_id -> стек активных действий [(token, action)]
+        self._bots = {}     # chat_id -> бот, через который отправляем действие
+        self._sent = {}     # chat_id -> последнее отправленное действие
+        self._due = {}      # chat_id -> время следующей отправки
+        self._wakeup = None
+        self._task = None
+        self._sending = set()  # запущенные отправки, чтобы задачи не собрал GC
+
+    def acquire(self, bot, chat_id, action=ChatAction.TYPING):
+        """Регистрирует активную работу в чате и возвращает токен для release()"""
+        token = object()
+        self._actions.setdefault(chat_id, []).append((token, action))
+        self._bots[chat_id] = bot
+
+        # Новое действие показываем сразу, повторное дождется общего тика
+        if self._sent.get(chat_id) != action:
+            self._due[chat_id] = 0
+
+        self._ensure_running()
+        self._wakeup.set()
+        return token
+
+    def release(self, chat_id, token):
+        """Снимает работу с чата; при последнем токене индикатор перестает обновляться"""
+        stack = self._actions.get(chat_id)
+        if not stack:
+            return
+
+        self._actions[chat_id] = stack = [entry for entry in stack if entry[0] is not token]
+        if not stack:
+            del self._actions[chat_id]
+            self._bots.pop(chat_id, None)
+            self._sent.pop(chat_id, None)
+            self._due.pop(chat_id, None)
+            # Будим цикл, чтобы он завершился, когда активных чатов не осталось
+            if self._wakeup is not None:
+                self._wakeup.set()
+
+    def _ensure_running(self):
+        if self._task is None or self._task.done():
+            # Event создаем вместе с задачей, чтобы он был привязан к текущему циклу событий
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        try:
+            while self._actions:
+                self._wakeup.clear()
+                now = loop.time()
+
+                # Отправки не ждем: медленный запрос не должен задерживать остальные чаты
+                for chat_id in [chat_id for chat_id, due in self._due.items() if due <= now]:
+                    self._schedule_send(chat_id, now)
+
+                timeout = min(self._due.values()) - now
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._task = None
+
+    def _schedule_send(self, chat_id, now):
+        # Показываем самое свежее из активных действий
+        action = self._actions[chat_id][-1][1]
+        self._sent[chat_id] = action
+        self._due[chat_id] = now + self.interval
+
+        task = asyncio.create_task(self._send(self._bots[chat_id], chat_id, action))
+        self._sending.add(task)
+        task.add_done_callback(self._sending.discard)
+
+    async def _send(self, bot, chat_id, action):
+        try:
+            await bot.send_chat_action(chat_id=chat_id, action=action)
+        except Exception as e:
+            logger.warning(f"Chat action error: {e}")
+
+chat_actions = ChatActionManager()
+
 # === Форматирование кода ===
 def detect_language(code_snippet):
     """Определяет язык программирования по сниппету кода"""
@@ -374,7 +463,7 @@ async def handle_photo_message(update: Update, context: CallbackContext) -> None
     chat_id = update.effective_chat.id
     
     # Показываем что бот работает с изображением
-    await context.bot.send_chat_action(chat_id=chat_id, action=ChatAction.TYPING)
+    action_token = chat_actions.acquire(context.bot, chat_id, ChatAction.TYPING)
     
     try:
         # Получаем фото с наилучшим качеством
@@ -413,6 +502,8 @@ async def handle_photo_message(update: Update, context: CallbackContext) -> None
     except Exception as e:
         logger.error(f"Photo processing error: {e}")
         await update.message.reply_text("❌ Ошибка обработки изображения. Попробуйте отправить другое фото.")
+    finally:
+        chat_actions.release(chat_id, action_token)
 
 # === Обработка голосовых сообщений ===
 async def handle_voice_message(update: Update, context: CallbackContext) -> None:
@@ -420,7 +511,7 @@ async def handle_voice_message(update: Update, context: CallbackContext) -> None
     voice = update.message.voice
     
     # Показываем что бот работает с голосовым сообщением
-    await context.bot.send_chat_action(chat_id=chat_id, action=ChatAction.TYPING)
+    action_token = chat_actions.acquire(context.bot, chat_id, ChatAction.TYPING)
     
     try:
         # Скачиваем голосовое сообщение
@@ -462,6 +553,8 @@ async def handle_voice_message(update: Update, context: CallbackContext) -> None
     except Exception as e:
         logger.error(f"Voice processing error: {e}")
         await update.message.reply_text("❌ Ошибка обработки голосового сообщения.")
+    finally:
+        chat_actions.release(chat_id, action_token)
 
 # === Основной обработчик ===
 async def handle_message(update: Update, context: CallbackContext, text_content: str = None) -> None:
@@ -478,14 +571,8 @@ async def handle_message(update: Update, context: CallbackContext, text_content:
     if user_message and user_message.startswith('/'):
         return
 
-    # Функция для периодической отправки индикатора "печатает"
-    async def keep_typing():
-        while True:
-            await context.bot.send_chat_action(chat_id=chat_id, action=ChatAction.TYPING)
-            await asyncio.sleep(4)  # Обновляем каждые 4 секунды
-
-    # Запускаем индикатор в фоне
-    typing_task = asyncio.create_task(keep_typing())
+    # Индикатор "печатает" обновляется общим менеджером действий
+    action_token = chat_actions.acquire(context.bot, chat_id, ChatAction.TYPING)
 
     try:
         # Инициализируем контекст чата
@@ -628,7 +715,7 @@ async def handle_message(update: Update, context: CallbackContext, text_content:
         )
     finally:
         # Останавливаем индикатор печати
-        typing_task.cancel()
+        chat_actions.release(chat_id, action_token)
 
 async def unknown_command(update: Update, context: CallbackContext) -> None:
     await update.message.reply_text(